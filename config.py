@@ -6,9 +6,24 @@ Description: Manages global configuration settings, persistence logic for user p
              and detection lists (Strong/Weak indicators, Uppercase exceptions) for Argus.
 """
 
+import re
+import sys
 import json
+import hashlib
 import file_manager as fm
-from pathlib import Path
+from typing import Optional
+
+# Optional: C-accelerated JSON (falls back to the standard library)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: Aho-Corasick keyword matching (falls back to plain substring tests)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # ==========================================
 # DEFAULT SETTINGS
@@ -18,6 +33,15 @@ DISCARD_COA = False
 SAVE_DEBUG_LOGS = True 
 USE_GPU = True
 GROUP_FOLDERS = True  # <--- NEW: Default to creating subfolders
+ENABLE_OCR_CACHE = True  # Reuse OCR text for images that were already scanned
+OCR_CACHE_MAX_ENTRIES = 5000  # Least recently used entries beyond this are deleted after each scan
+
+# Longest image side handed to the OCR engine; larger scans are downscaled first
+OCR_MAX_SIDE = 1600
+
+# How sorted files are written: "copy", "clone" (copy-on-write where supported) or "hardlink"
+COPY_MODES = ("copy", "clone", "hardlink")
+COPY_MODE = "clone"
 
 # Default to "Output" folder next to the app
 OUTPUT_FOLDER = str(fm.get_application_path() / "Output")
@@ -43,56 +67,255 @@ FORCE_UPPERCASE = [
     'GCPD', 'CIA', 'FBI', 'AKA', 'USA', 'UN', 'SSD', 'DHD', 'NASA'
 ]
 
+# ==========================================
+# DERIVED LOOKUPS
+# ==========================================
+# Rebuilt by _rebuild_derived() whenever the detection lists change
+STRONG_SET = frozenset()
+WEAK_SET = frozenset()
+_STRONG_AC = None
+_WEAK_AC = None
+_INDICATOR_AC = None
+
+FORCE_UPPERCASE_SET = frozenset()
+FORCE_UPPERCASE_RE = None
+
+def _keyword_automaton(keywords):
+    """
+    Builds an Aho-Corasick automaton over the (uppercase) keywords, finding every
+    occurrence of every keyword in one linear scan. Returns None if unavailable or empty.
+    """
+    if ahocorasick is None or not keywords:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for kw in keywords:
+        automaton.add_word(kw, kw)
+    automaton.make_automaton()
+    return automaton
+
+def _indicator_automaton():
+    """
+    Builds one Aho-Corasick automaton over both indicator lists, so a text can be
+    classified in a single scan. Each keyword maps to (is_strong, keyword).
+    Returns None if unavailable or both lists are empty.
+    """
+    if ahocorasick is None or not (STRONG_SET or WEAK_SET):
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for kw in WEAK_SET:
+        automaton.add_word(kw, (False, kw))
+    # Added last, so a keyword in both lists counts as Strong
+    for kw in STRONG_SET:
+        automaton.add_word(kw, (True, kw))
+    automaton.make_automaton()
+    return automaton
+
+def _compile_indicators():
+    """
+    Rebuilds the Strong and Weak keyword sets and, when pyahocorasick is available,
+    the automatons that scan OCR text once per list rather than once per keyword.
+    """
+    global STRONG_SET, WEAK_SET, _STRONG_AC, _WEAK_AC, _INDICATOR_AC
+
+    STRONG_SET = frozenset(STRONG_INDICATORS)
+    WEAK_SET = frozenset(WEAK_INDICATORS)
+
+    _STRONG_AC = _keyword_automaton(STRONG_SET)
+    _WEAK_AC = _keyword_automaton(WEAK_SET)
+    _INDICATOR_AC = _indicator_automaton()
+
+def has_strong(text: str, text_upper: Optional[str] = None) -> bool:
+    """
+    Returns True as soon as any Strong indicator is found in the text.
+    Pass text_upper (text.upper()) if the caller already has it.
+    """
+    if not text or not STRONG_SET:
+        return False
+    text_upper = text_upper or text.upper()
+    if _STRONG_AC is not None:
+        return next(_STRONG_AC.iter(text_upper), None) is not None
+    return any(kw in text_upper for kw in STRONG_SET)
+
+def count_weak(text: str, text_upper: Optional[str] = None) -> int:
+    """
+    Counts the distinct Weak indicators present in the text.
+    Pass text_upper (text.upper()) if the caller already has it.
+    """
+    if not text or not WEAK_SET:
+        return 0
+    text_upper = text_upper or text.upper()
+    if _WEAK_AC is not None:
+        return len({kw for _, kw in _WEAK_AC.iter(text_upper)})
+    return sum(1 for kw in WEAK_SET if kw in text_upper)
+
+def has_indicators(text: str, weak_needed: int, text_upper: Optional[str] = None) -> bool:
+    """
+    Returns True if the text holds any Strong indicator, or at least weak_needed
+    distinct Weak indicators. With Aho-Corasick available both lists are matched
+    in one scan that stops as soon as the answer is known.
+    """
+    if not text:
+        return False
+    if _INDICATOR_AC is None:
+        return has_strong(text, text_upper) or count_weak(text, text_upper) >= weak_needed
+
+    weak_found = set()
+    for _, (strong, kw) in _INDICATOR_AC.iter(text_upper or text.upper()):
+        if strong:
+            return True
+        weak_found.add(kw)
+        if len(weak_found) >= weak_needed:
+            return True
+    return False
+
+def _compile_uppercase():
+    """
+    Compiles the Force Uppercase acronyms into one case-insensitive pattern
+    (longest first), so descriptions are fixed in a single substitution.
+    """
+    global FORCE_UPPERCASE_SET, FORCE_UPPERCASE_RE
+
+    FORCE_UPPERCASE_SET = frozenset(word for word in FORCE_UPPERCASE if word)
+
+    if not FORCE_UPPERCASE_SET:
+        FORCE_UPPERCASE_RE = None
+        return
+
+    words = sorted(FORCE_UPPERCASE_SET, key=len, reverse=True)
+    FORCE_UPPERCASE_RE = re.compile(r'\b(' + '|'.join(map(re.escape, words)) + r')\b', re.IGNORECASE)
+
+def _normalize(keywords) -> list:
+    """Uppercases, interns and de-duplicates keywords, keeping their display order."""
+    return list(dict.fromkeys(sys.intern(kw.upper()) for kw in keywords))
+
+def _normalize_lists():
+    """
+    Normalizes the detection lists once, so matching code never has to re-case
+    individual keywords (settings.json may hold mixed case or repeats).
+    The lists stay ordered for the settings page; lookups use the derived frozensets.
+    """
+    global STRONG_INDICATORS, WEAK_INDICATORS, FORCE_UPPERCASE
+
+    STRONG_INDICATORS = _normalize(STRONG_INDICATORS)
+    WEAK_INDICATORS = _normalize(WEAK_INDICATORS)
+    FORCE_UPPERCASE = _normalize(FORCE_UPPERCASE)
+
+# Detection lists the current lookups were built from (see _rebuild_derived)
+_DERIVED_FROM = None
+
+# Short hash of those lists; results computed under a different signature are stale
+DETECTION_SIGNATURE = ""
+
+def _rebuild_derived():
+    """
+    Normalizes the detection lists and refreshes every lookup derived from them.
+    Recompiling is skipped when the lists are unchanged since the last build.
+    """
+    global _DERIVED_FROM, DETECTION_SIGNATURE
+
+    _normalize_lists()
+
+    signature = (tuple(STRONG_INDICATORS), tuple(WEAK_INDICATORS), tuple(FORCE_UPPERCASE))
+    if signature == _DERIVED_FROM:
+        return
+
+    _compile_indicators()
+    _compile_uppercase()
+    _DERIVED_FROM = signature
+    DETECTION_SIGNATURE = hashlib.blake2b(repr(signature).encode('utf-8'), digest_size=8).hexdigest()
+
+_rebuild_derived()
+
 # ==========================================
 # PERSISTENCE LOGIC
 # ==========================================
+# Resolved once at import; the application path never changes at runtime
+_SETTINGS_PATH = fm.get_application_path() / "settings.json"
+
+# Persisted settings, in the order they are written to disk
+_SETTINGS_KEYS = (
+    "APPEND_ORIGINAL_NAME", "DISCARD_COA", "SAVE_DEBUG_LOGS", "USE_GPU",
+    "GROUP_FOLDERS", "ENABLE_OCR_CACHE", "OCR_CACHE_MAX_ENTRIES", "OCR_MAX_SIDE", "COPY_MODE", "OUTPUT_FOLDER",
+    "STRONG_INDICATORS", "WEAK_INDICATORS", "FORCE_UPPERCASE"
+)
+
+# Value COPY_MODE falls back to when settings.json holds an unknown mode
+_DEFAULT_COPY_MODE = COPY_MODE
+
+# Snapshot of the settings last read from / written to disk (None = unknown)
+_LAST_SAVED_STATE = None
+
 def get_settings_path():
-    return fm.get_application_path() / "settings.json"
+    return _SETTINGS_PATH
+
+def _snapshot(values: Optional[dict] = None) -> tuple:
+    """
+    Captures the persisted settings as a cheap, comparable value (no serialization).
+    Reads the current module settings, or the given parsed settings dict.
+    """
+    values = globals() if values is None else values
+    return tuple(tuple(v) if isinstance(v, list) else v for v in (values[key] for key in _SETTINGS_KEYS))
+
+def _serialize() -> bytes:
+    """Serializes the current settings exactly as they are written to disk."""
+    g = globals()
+    data = {key: g[key] for key in _SETTINGS_KEYS}
+
+    # Both paths produce identical bytes (2-space indent, raw UTF-8), so the file
+    # format does not depend on whether orjson is installed
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
 
 def load():
-    global APPEND_ORIGINAL_NAME, DISCARD_COA, SAVE_DEBUG_LOGS, USE_GPU, GROUP_FOLDERS, OUTPUT_FOLDER
-    global STRONG_INDICATORS, WEAK_INDICATORS, FORCE_UPPERCASE
-    
-    path = get_settings_path()
+    global _LAST_SAVED_STATE
+
+    path = _SETTINGS_PATH
     if not path.exists():
         return
 
     try:
-        with open(path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-        if "APPEND_ORIGINAL_NAME" in data: APPEND_ORIGINAL_NAME = data["APPEND_ORIGINAL_NAME"]
-        if "DISCARD_COA" in data: DISCARD_COA = data["DISCARD_COA"]
-        if "SAVE_DEBUG_LOGS" in data: SAVE_DEBUG_LOGS = data["SAVE_DEBUG_LOGS"]
-        if "USE_GPU" in data: USE_GPU = data["USE_GPU"]
-        if "GROUP_FOLDERS" in data: GROUP_FOLDERS = data["GROUP_FOLDERS"]  # <--- Load new setting
-        if "OUTPUT_FOLDER" in data: OUTPUT_FOLDER = data["OUTPUT_FOLDER"]
-        
-        # Load lists
-        if "STRONG_INDICATORS" in data: STRONG_INDICATORS = data["STRONG_INDICATORS"]
-        if "WEAK_INDICATORS" in data: WEAK_INDICATORS = data["WEAK_INDICATORS"]
-        if "FORCE_UPPERCASE" in data: FORCE_UPPERCASE = data["FORCE_UPPERCASE"]
+        raw = path.read_bytes()
+        data = orjson.loads(raw) if orjson else json.loads(raw)
+
+        # Only known keys are applied; anything missing keeps its default
+        g = globals()
+        for key in _SETTINGS_KEYS:
+            if key in data:
+                g[key] = data[key]
+
+        # An unknown copy mode (e.g. a typo) would silently mean a full copy; keep the default
+        if COPY_MODE not in COPY_MODES:
+            print(f"⚠️ Unknown COPY_MODE {COPY_MODE!r} in {path.name}; using {_DEFAULT_COPY_MODE!r}.")
+            g["COPY_MODE"] = _DEFAULT_COPY_MODE
+
+        _rebuild_derived()
+
+        # Only mark as saved if the file already holds every setting with its
+        # current (normalized) value; compared on parsed values, not re-serialized
+        state = _snapshot()
+        is_current = all(key in data for key in _SETTINGS_KEYS) and _snapshot(data) == state
+        _LAST_SAVED_STATE = state if is_current else None
             
         print(f"✅ Config loaded from {path.name}")
     except Exception as e:
         print(f"⚠️ Failed to load settings: {e}")
 
 def save():
-    data = {
-        "APPEND_ORIGINAL_NAME": APPEND_ORIGINAL_NAME,
-        "DISCARD_COA": DISCARD_COA,
-        "SAVE_DEBUG_LOGS": SAVE_DEBUG_LOGS,
-        "USE_GPU": USE_GPU,
-        "GROUP_FOLDERS": GROUP_FOLDERS,  # <--- Save new setting
-        "OUTPUT_FOLDER": OUTPUT_FOLDER,
-        "STRONG_INDICATORS": STRONG_INDICATORS,
-        "WEAK_INDICATORS": WEAK_INDICATORS,
-        "FORCE_UPPERCASE": FORCE_UPPERCASE
-    }
+    global _LAST_SAVED_STATE
+
+    _rebuild_derived()
     
     try:
-        with open(get_settings_path(), 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4)
+        # Nothing changed since the last load/save; skip serializing and the disk write
+        state = _snapshot()
+        if state == _LAST_SAVED_STATE:
+            return
+
+        _SETTINGS_PATH.write_bytes(_serialize())
+        _LAST_SAVED_STATE = state
         print("✅ Config saved successfully.")
     except Exception as e:
         print(f"⚠️ Failed to save settings: {e}")
\ No newline at end of file
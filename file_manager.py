@@ -6,10 +6,44 @@ Description: Utility module for file system operations. Handles path resolution,
              directory management, safe file copying, and debug logging.
 """
 
+import os
 import sys
+import errno
 import shutil
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Any, List, Tuple, Union
+
+# fcntl is POSIX-only; reflink cloning is simply skipped elsewhere
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Upper bound for concurrent file operations (copies/deletes are I/O-bound)
+MAX_IO_WORKERS = 32
+
+# Linux FICLONE ioctl: the new file shares the source's data blocks (Btrfs, XFS, bcachefs)
+_FICLONE = 0x40049409
+
+# FICLONE errors meaning "never possible here" (ext4/NTFS, or source on another device)
+_REFLINK_UNSUPPORTED = {errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV}
+
+# Destination folders where cloning already failed; copies go straight to copy2
+_NO_REFLINK_DIRS = set()
+
+# Directories already created during the current batch (see ensure_directory)
+_CREATED_DIRS = set()
+
+def _resolve_application_path() -> Path:
+    if getattr(sys, 'frozen', False):
+        return Path(sys.executable).parent
+
+    return Path(__file__).parent
+
+# Resolved once at import; the location cannot change within a process
+_APPLICATION_PATH = _resolve_application_path()
 
 def get_application_path() -> Path:
     """
@@ -18,71 +52,174 @@ def get_application_path() -> Path:
     Returns:
         Path: Parent directory of the executable (if frozen) or the script (if running from source).
     """
-    if getattr(sys, 'frozen', False):
-        return Path(sys.executable).parent
+    return _APPLICATION_PATH
 
-    return Path(__file__).parent
+def ensure_directory(folder: Path) -> None:
+    """
+    Creates a directory (and parents) once; later calls for the same folder
+    skip the filesystem entirely.
+    """
+    if folder in _CREATED_DIRS:
+        return
+
+    folder.mkdir(parents=True, exist_ok=True)
+    _CREATED_DIRS.add(folder)
+
+def forget_directories() -> None:
+    """
+    Clears the ensure_directory() cache.
+    Call at the start of each batch, as folders may have been removed since.
+    """
+    _CREATED_DIRS.clear()
 
 def clean_directory(folder: Path) -> None:
     """
     Removes all contents (files and subdirectories) within a specified folder.
+    Entries are removed individually so a single locked file does not abort the clean.
     """
     if not folder.exists():
         return
 
-    for item in folder.iterdir():
-        try:
-            if item.is_file() or item.is_symlink():
-                item.unlink()
-            elif item.is_dir():
-                shutil.rmtree(item)
-        except Exception as e:
-            print(f"⚠️ Failed to clean {item.name}: {e}")
+    # Subfolders are about to disappear
+    forget_directories()
+
+    # scandir entries carry their file type, avoiding an extra stat per item
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+            except Exception as e:
+                print(f"⚠️ Failed to clean {entry.name}: {e}")
 
-def save_text_log(path: Path, text: str) -> None:
+def file_digest(path: Path) -> str:
     """
-    Writes text content to a markdown file, creating parent directories if needed.
+    Hashes a file's contents (BLAKE2b, 64-bit digest).
+    
+    Returns:
+        str: 16-character hex digest identifying the file contents.
+    """
+    return hashlib.blake2b(path.read_bytes(), digest_size=8).hexdigest()
+
+# Placeholder section body for images without any OCR text
+_EMPTY_LOG_BODY = "(No text detected)"
+
+def save_batch_log(path: Path, entries: List[Tuple[str, str]]) -> None:
+    """
+    Writes the text of every scanned file into one markdown file, using one
+    section per (name, text) entry. A single open/write replaces one file per image.
     """
     try:
-        path.parent.mkdir(parents=True, exist_ok=True)
+        ensure_directory(path.parent)
         
-        content = f"# File: {path.stem}\n\n"
-        content += text if text else "(No text detected)"
+        body = "\n\n---\n\n".join(f"# File: {name}\n\n{text or _EMPTY_LOG_BODY}" for name, text in entries)
         
-        path.write_text(content, encoding='utf-8')
+        path.write_bytes(body.encode('utf-8'))
     except Exception as e:
         print(f"⚠️ Failed to save log: {e}")
 
-def copy_file(src: Path, dest: Path) -> bool:
+def _try_reflink(src: Path, dest: Path) -> bool:
+    """
+    Clones a file as a copy-on-write reflink (Linux only).
+    
+    Returns:
+        bool: True if cloned, False if the platform/filesystem does not support it.
+    """
+    if fcntl is None or not sys.platform.startswith('linux') or dest.parent in _NO_REFLINK_DIRS:
+        return False
+
+    try:
+        with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+    except OSError as e:
+        # Filesystem/device can't clone: don't retry for the rest of this folder
+        if e.errno in _REFLINK_UNSUPPORTED:
+            _NO_REFLINK_DIRS.add(dest.parent)
+        try:
+            os.unlink(dest)
+        except OSError:
+            pass
+        return False
+
+    shutil.copystat(src, dest)
+    return True
+
+def _try_hardlink(src: Path, dest: Path) -> bool:
+    """Hard-links dest to src. Returns False if the filesystem refuses (e.g. across drives)."""
+    try:
+        os.link(src, dest)
+        return True
+    except OSError:
+        return False
+
+def copy_file(src: Path, dest: Path, mode: str = "copy") -> bool:
     """
     Copies a file from source to destination, preserving metadata.
+    shutil.copy2 already uses the OS-native copy (CopyFile2 on Windows with
+    Python 3.12+, sendfile on Linux), so no userspace byte loop is involved.
+    With mode "clone" or "hardlink" the data is shared instead of duplicated where
+    the filesystem allows it, falling back to a regular copy otherwise.
     
     Returns:
         bool: True if copy succeeded, False otherwise.
     """
     try:
         # Ensure destination directory exists
-        dest.parent.mkdir(parents=True, exist_ok=True)
+        ensure_directory(dest.parent)
+
+        if mode == "hardlink" and _try_hardlink(src, dest):
+            return True
+        if mode == "clone" and _try_reflink(src, dest):
+            return True
         
-        shutil.copy2(src, dest)
+        shutil.copy2(os.fspath(src), os.fspath(dest))
         return True
     except Exception as e:
         print(f"❌ Failed to copy {src.name}: {e}")
         return False
 
-def delete_files(file_list: List[Path]) -> int:
+def copy_files(pairs: List[Tuple[Path, Path]], mode: str = "copy", stop_event: Any = None) -> List[bool]:
+    """
+    Copies many files concurrently. Each pair is (source, destination).
+    See copy_file() for the available modes. Once stop_event (a threading.Event)
+    is set, copies that have not started yet are skipped and report False.
+    
+    Returns:
+        List[bool]: Success flag for each pair, in input order.
+    """
+    if not pairs:
+        return []
+
+    def copy_pair(pair: Tuple[Path, Path]) -> bool:
+        if stop_event is not None and stop_event.is_set():
+            return False
+        return copy_file(*pair, mode)
+
+    with ThreadPoolExecutor(max_workers=min(MAX_IO_WORKERS, len(pairs))) as pool:
+        return list(pool.map(copy_pair, pairs))
+
+def _try_delete(path: Union[str, Path]) -> int:
+    """Deletes a single file. Returns 1 on success, 0 otherwise."""
+    try:
+        os.unlink(path)
+        return 1
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"⚠️ Could not delete {os.path.basename(path)}: {e}")
+    return 0
+
+def delete_files(file_list: List[Union[str, Path]]) -> int:
     """
-    Deletes a list of files from the filesystem.
+    Deletes a list of files from the filesystem concurrently.
     
     Returns:
         int: Count of successfully deleted files.
     """
-    count = 0
-    for path in file_list:
-        try:
-            if path.exists():
-                path.unlink()
-                count += 1
-        except Exception as e:
-            print(f"⚠️ Could not delete {path.name}: {e}")
-    return count
\ No newline at end of file
+    if not file_list:
+        return 0
+
+    with ThreadPoolExecutor(max_workers=min(MAX_IO_WORKERS, len(file_list))) as pool:
+        return sum(pool.map(_try_delete, file_list))
\ No newline at end of file
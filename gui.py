@@ -10,8 +10,9 @@ Description: The graphical user interface for Argus. Built with CustomTkinter, i
 import os
 import sys
 import threading
+import collections
 import ctypes
-import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import List
 
@@ -21,20 +22,30 @@ from typing import List
 # This block must execute before importing 'onnxruntime' or 'main'
 # to ensure Windows finds the local NVIDIA DLLs.
 
+# Set to the PID of the process that injected the libraries. Kept in the environment
+# rather than a module global so it survives a module reload; child processes
+# inherit it with a different PID and still inject their own DLL directory.
+_GPU_LIBS_ENV = "ARGUS_GPU_LIBS_INJECTED"
+
 def _inject_gpu_libraries():
     """
     Forces the local 'libraries' folder into the Windows DLL search path.
+    Only the first call in a process has an effect, including across module reloads.
     """
-    if sys.platform != "win32":
+    if sys.platform != "win32" or os.environ.get(_GPU_LIBS_ENV) == str(os.getpid()):
         return
+    os.environ[_GPU_LIBS_ENV] = str(os.getpid())
 
     base_path = Path(__file__).resolve().parent
     libs_path = base_path / "libraries"
 
     if libs_path.exists():
         # 1. Force into Environment PATH (The "Aggressive" Fix)
-        # This allows DLLs to find *other* DLLs in the same folder
-        os.environ["PATH"] = str(libs_path) + os.pathsep + os.environ["PATH"]
+        # This allows DLLs to find *other* DLLs in the same folder.
+        # Skipped if already present, so PATH (and every DLL lookup) doesn't grow.
+        env_path = os.environ.get("PATH", "")
+        if str(libs_path) not in env_path.split(os.pathsep):
+            os.environ["PATH"] = str(libs_path) + os.pathsep + env_path
         
         # 2. The Standard Python 3.8+ Fix
         try:
@@ -56,10 +67,18 @@ from tkinter import filedialog, PhotoImage
 import customtkinter as ctk
 
 # Application Modules
-import main
+# 'main' pulls in ONNX Runtime and the OCR models; it is imported in the
+# background once the window is up (see ArgusApp._load_backend).
 import file_manager as fm
 import config
 
+main = None
+
+# Settings are read from disk while Tk initializes; ArgusApp joins this
+# thread right before any widget needs the values.
+_config_loader = threading.Thread(target=config.load, daemon=True)
+_config_loader.start()
+
 # ==========================================
 # APP CONFIGURATION
 # ==========================================
@@ -67,6 +86,14 @@ import config
 ctk.set_appearance_mode("Dark")
 ctk.set_default_color_theme("blue")
 
+# How often queued log lines and progress are pushed to the widgets (milliseconds).
+# Polling slows down while no sort is running to keep idle CPU usage low.
+UI_FLUSH_INTERVAL_MS = 50
+UI_IDLE_FLUSH_INTERVAL_MS = 250
+
+# Shared styling for the settings toggles
+SWITCH_STYLE = dict(font=("Roboto", 14), button_color="#2CC985", progress_color="#555555")
+
 class ArgusApp(ctk.CTk):
     """
     Main Application Window.
@@ -101,16 +128,34 @@ class ArgusApp(ctk.CTk):
                 self.iconbitmap(str(ico_path))
             elif png_path.exists():
                 # Fallback for Window decoration
-                img = PhotoImage(file=str(png_path))
-                self.iconphoto(True, img)
-                self.after(200, lambda: self.iconphoto(True, img))
+                # Keep a reference so Tk's image is not garbage-collected after __init__
+                self._icon_img = PhotoImage(file=str(png_path))
+                self.iconphoto(True, self._icon_img)
         except Exception as e:
             print(f"Warning: Could not load icon: {e}")
 
         # 4. STATE INITIALIZATION
-        config.load()
+        _config_loader.join()
         self.is_running = False
+        self.backend_ready = False
         self.stop_event = threading.Event()
+        self._log_buffer = collections.deque()
+        self._pending_progress = None
+        self._run_finished = False
+
+        # OCR engine, built on first run and reused while the GPU setting is unchanged
+        self.ocr_engine = None
+        self._engine_uses_gpu = None
+
+        # Settings are applied and saved off the UI thread by one worker, so saves
+        # run in click order and never touch config concurrently
+        self._settings_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="argus-settings")
+        self._settings_future = None
+
+        # Single long-lived worker: backend loading and every sort run on the
+        # same thread, so anything it initializes stays warm between runs.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="argus-worker")
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # 5. UI FRAME SETUP
         self.home_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -122,6 +167,12 @@ class ArgusApp(ctk.CTk):
         # Start on Home Page
         self.show_home()
 
+        self.after(UI_FLUSH_INTERVAL_MS, self._flush_ui)
+
+        # 6. DEFERRED BACKEND LOADING
+        # The window is shown immediately while the heavy OCR stack imports
+        self._executor.submit(self._load_backend)
+
     # ==========================================
     # NAVIGATION METHODS
     # ==========================================
@@ -137,28 +188,52 @@ class ArgusApp(ctk.CTk):
         self.home_frame.pack_forget()
         self.settings_frame.pack(fill="both", expand=True)
 
+    def _on_close(self) -> None:
+        """Signals any running job to stop and releases the worker before closing."""
+        self.stop_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        # Queued settings saves are kept; they finish before the process exits
+        self._settings_executor.shutdown(wait=False)
+        self.destroy()
+
     def save_and_go_home(self) -> None:
         """Persists all settings from UI inputs to config file and returns home."""
-        # 1. Update Toggles & Folder Paths
+        # 1. Apply Toggles & Folder Path here, so anything started after Back sees them at once
         config.APPEND_ORIGINAL_NAME = self.var_append.get()
         config.DISCARD_COA = self.var_discard_coa.get()
         config.SAVE_DEBUG_LOGS = self.var_debug_logs.get()
         config.USE_GPU = self.var_use_gpu.get()
         config.GROUP_FOLDERS = self.var_group_folders.get()
+        # Turning hardlinks off restores the mode they replaced (e.g. a "copy" from settings.json)
+        config.COPY_MODE = "hardlink" if self.var_hardlinks.get() else self._unlinked_copy_mode
         config.OUTPUT_FOLDER = self.entry_output.get()
+
+        # 2. Read List textboxes (Tk calls stay on the UI thread)
+        raw_lists = tuple(box.get("1.0", "end") for box in (self.txt_strong, self.txt_weak, self.txt_force))
         
-        # 2. Update Lists (Helper to parse textbox content)
-        def get_list(textbox: ctk.CTkTextbox) -> List[str]:
-            raw = textbox.get("1.0", "end").strip()
+        # 3. Parse & Save on the settings worker, then Navigate.
+        # Pool workers are joined at exit, so a pending write still completes if the window is closed
+        self._settings_future = self._settings_executor.submit(self._apply_settings, *raw_lists)
+        self.show_home()
+
+    def _apply_settings(self, raw_strong: str, raw_weak: str, raw_force: str) -> None:
+        """Parses the list textboxes' contents and persists all settings (settings worker)."""
+        def get_list(raw: str) -> List[str]:
             return [l.strip().upper() for l in raw.split('\n') if l.strip()]
 
-        config.STRONG_INDICATORS = get_list(self.txt_strong)
-        config.WEAK_INDICATORS = get_list(self.txt_weak)
-        config.FORCE_UPPERCASE = get_list(self.txt_force)
-        
-        # 3. Save & Navigate
+        config.STRONG_INDICATORS = get_list(raw_strong)
+        config.WEAK_INDICATORS = get_list(raw_weak)
+        config.FORCE_UPPERCASE = get_list(raw_force)
         config.save()
-        self.show_home()
+
+    def clear_ocr_cache(self) -> None:
+        """Deletes all cached OCR results (settings worker), so the next run re-scans every image."""
+        def clear() -> None:
+            main.clear_ocr_cache()
+            self.log("🧹 OCR cache cleared.")
+
+        # Settings are only reachable while no run is active, so no scan is using the cache
+        self._settings_executor.submit(clear)
 
     def browse_output_folder(self) -> None:
         """Opens directory picker for Output Folder."""
@@ -224,6 +299,12 @@ class ArgusApp(ctk.CTk):
         )
         btn_back.place(relx=0.05, rely=0.5, anchor="w")
 
+        btn_clear_cache = ctk.CTkButton(
+            header_frame, text="🧹 Clear OCR Cache", width=140, fg_color="transparent",
+            border_width=1, border_color="gray", command=self.clear_ocr_cache
+        )
+        btn_clear_cache.place(relx=0.95, rely=0.5, anchor="e")
+
         lbl_title = ctk.CTkLabel(header_frame, text="Configuration", font=("Roboto Medium", 32))
         lbl_title.pack(side="top")
 
@@ -256,29 +337,27 @@ class ArgusApp(ctk.CTk):
         
         # Define Switches
         self.var_append = ctk.BooleanVar(value=config.APPEND_ORIGINAL_NAME)
-        sw1 = ctk.CTkSwitch(toggles_frame, text="Append Original Filename", variable=self.var_append, font=("Roboto", 14), button_color="#2CC985", progress_color="#555555")
-        
         self.var_discard_coa = ctk.BooleanVar(value=config.DISCARD_COA)
-        sw2 = ctk.CTkSwitch(toggles_frame, text="Discard COA Image", variable=self.var_discard_coa, font=("Roboto", 14), button_color="#2CC985", progress_color="#555555")
-        
         self.var_use_gpu = ctk.BooleanVar(value=config.USE_GPU)
-        sw_gpu = ctk.CTkSwitch(toggles_frame, text="Use GPU Acceleration", variable=self.var_use_gpu, font=("Roboto", 14), button_color="#2CC985", progress_color="#555555")
-        
         self.var_group_folders = ctk.BooleanVar(value=config.GROUP_FOLDERS)
-        sw_group = ctk.CTkSwitch(toggles_frame, text="Group into Folders", variable=self.var_group_folders, font=("Roboto", 14), button_color="#2CC985", progress_color="#555555")
-        
         self.var_debug_logs = ctk.BooleanVar(value=config.SAVE_DEBUG_LOGS)
-        sw3 = ctk.CTkSwitch(toggles_frame, text="Save Text Logs (.md)", variable=self.var_debug_logs, font=("Roboto", 14), button_color="#2CC985", progress_color="#555555")
-
-        # Place them in a clean 2-row Grid
-        # Row 1
-        sw1.grid(row=0, column=0, padx=10, pady=10, sticky="w")
-        sw2.grid(row=0, column=1, padx=10, pady=10, sticky="w")
-        sw_gpu.grid(row=0, column=2, padx=10, pady=10, sticky="w")
-
-        # Row 2
-        sw_group.grid(row=1, column=0, padx=10, pady=10, sticky="w")
-        sw3.grid(row=1, column=1, padx=10, pady=10, sticky="w")
+        self.var_hardlinks = ctk.BooleanVar(value=config.COPY_MODE == "hardlink")
+        # Copy mode used while hardlinks are off ("clone" is the default)
+        self._unlinked_copy_mode = "clone" if config.COPY_MODE == "hardlink" else config.COPY_MODE
+
+        # Place them in a clean 2-row Grid: (label, variable, row, column)
+        switches = [
+            ("Append Original Filename", self.var_append, 0, 0),
+            ("Discard COA Image", self.var_discard_coa, 0, 1),
+            ("Use GPU Acceleration", self.var_use_gpu, 0, 2),
+            ("Group into Folders", self.var_group_folders, 1, 0),
+            ("Save Text Logs (.md)", self.var_debug_logs, 1, 1),
+            # Hard links share the source file: editing or deleting an output changes the original
+            ("Hardlink (Edits Change Originals!)", self.var_hardlinks, 1, 2),
+        ]
+        for text, variable, row, column in switches:
+            switch = ctk.CTkSwitch(toggles_frame, text=text, variable=variable, **SWITCH_STYLE)
+            switch.grid(row=row, column=column, padx=10, pady=10, sticky="w")
 
         # Divider
         ctk.CTkFrame(content, height=2, fg_color="#444444").pack(fill="x", padx=40, pady=15)
@@ -292,8 +371,9 @@ class ArgusApp(ctk.CTk):
             frame.pack(side="left", fill="both", expand=True, padx=5)
             ctk.CTkLabel(frame, text=title, font=("Roboto Medium", 14)).pack(anchor="w", pady=(0, 5))
             textbox = ctk.CTkTextbox(frame, font=("Consolas", 12), height=150)
-            textbox.pack(fill="both", expand=True)
+            # Populate before packing so the widget is laid out once with its content
             textbox.insert("1.0", "\n".join(data_list))
+            textbox.pack(fill="both", expand=True)
             return textbox
 
         self.txt_strong = create_list_col(lists_frame, "Strong Indicators (Match 1):", config.STRONG_INDICATORS)
@@ -305,13 +385,54 @@ class ArgusApp(ctk.CTk):
     # ==========================================
     
     def log(self, message: str) -> None:
-        """Appends message to the console textbox."""
-        self.textbox.insert("end", message + "\n")
-        self.textbox.see("end")
+        """
+        Queues a message for the console textbox.
+        Safe to call from worker threads; lines are written by _flush_ui().
+        """
+        self._log_buffer.append(message + "\n")
+
+    def _flush_ui(self) -> None:
+        """
+        Applies queued log lines (in a single insert), the latest progress value
+        and end-of-run state on the UI thread, then reschedules itself.
+        Worker threads only hand data over; they never call into Tk directly.
+        """
+        if self._log_buffer:
+            batch = []
+            while self._log_buffer:
+                batch.append(self._log_buffer.popleft())
+
+            self.textbox.insert("end", "".join(batch))
+            self.textbox.see("end")
+
+        progress, self._pending_progress = self._pending_progress, None
+        if progress is not None:
+            self.progress.set(progress)
+
+        if self._run_finished:
+            self._run_finished = False
+            self.is_running = False
+            self.btn_run.configure(state="normal", text="RENAME PHOTOS", fg_color="#2CC985", hover_color="#229A65")
+
+        delay = UI_FLUSH_INTERVAL_MS if self.is_running else UI_IDLE_FLUSH_INTERVAL_MS
+        self.after(delay, self._flush_ui)
+
+    def _load_backend(self) -> None:
+        """Imports the OCR processing module on the worker thread."""
+        global main
+        try:
+            import main
+            self.backend_ready = True
+            self.log("AI backend loaded.")
+        except Exception as e:
+            self.log(f"CRITICAL ERROR: Failed to load AI backend: {e}")
 
     def update_progress(self, val: float) -> None:
-        """Updates the progress bar (0.0 to 1.0)."""
-        self.progress.set(val)
+        """
+        Updates the progress bar (0.0 to 1.0).
+        Only the most recent value is kept until the next _flush_ui().
+        """
+        self._pending_progress = val
 
     def handle_button_click(self) -> None:
         """Toggles between starting selection and stopping operation."""
@@ -319,6 +440,8 @@ class ArgusApp(ctk.CTk):
             self.stop_event.set()
             self.log("🛑 Stopping... Please wait.")
             self.btn_run.configure(text="STOPPING...", state="disabled")
+        elif not self.backend_ready:
+            self.log("⏳ AI backend is still loading, please try again in a moment.")
         else:
             self.start_selection()
 
@@ -337,23 +460,34 @@ class ArgusApp(ctk.CTk):
         self.stop_event.clear()
         
         self.btn_run.configure(text="CANCEL OPERATION", fg_color="#D94040", hover_color="#A32424")
+        self._pending_progress = None
         self.progress.set(0)
         self.textbox.delete("1.0", "end")
         
-        # Start processing in background thread to keep GUI responsive
-        threading.Thread(target=self.run_process, args=(files, output_dir)).start()
+        # Start processing on the worker thread to keep GUI responsive
+        self._executor.submit(self.run_process, files, output_dir)
 
     def run_process(self, file_list: List[str], output_path: Path) -> None:
         """Wrapper for the main processing logic."""
         try:
-            main.run_sorter(file_list, output_path, self.log, self.update_progress, self.stop_event)
+            # Keyword lists saved just before Run must be parsed before scanning starts
+            # (the settings worker is FIFO, so the latest save finishing means all did)
+            if self._settings_future is not None:
+                wait([self._settings_future])
+
+            if self.ocr_engine is None or self._engine_uses_gpu != config.USE_GPU:
+                self.ocr_engine = main.create_engine(self.log)
+                self._engine_uses_gpu = config.USE_GPU
+
+            main.run_sorter(file_list, output_path, self.log, self.update_progress,
+                            self.stop_event, engine=self.ocr_engine)
         except Exception as e:
             self.log(f"CRITICAL ERROR: {e}")
             import traceback
             traceback.print_exc()
         
-        self.is_running = False
-        self.btn_run.configure(state="normal", text="RENAME PHOTOS", fg_color="#2CC985", hover_color="#229A65")
+        # The UI thread resets the button on its next flush
+        self._run_finished = True
 
 if __name__ == "__main__":
     app = ArgusApp()
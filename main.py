@@ -7,31 +7,190 @@ Description: The core orchestration script. Coordinates the workflow between OCR
              Supports Multi-SKU grouping and Anchor-Folder sorting.
 """
 
-import sys
-import difflib
-import re
+import os
+import json
+import math
+import functools
+import threading
+import weakref
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any, Callable, Optional
+from typing import TYPE_CHECKING, List, Dict, Set, Tuple, Any, Callable, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageOps
+from rapidfuzz import fuzz, process
+
+# RapidOCR pulls in ONNX Runtime and is only imported once an engine is built
+if TYPE_CHECKING:
+    from rapidocr_onnxruntime import RapidOCR
 
-from rapidocr_onnxruntime import RapidOCR
 import config
 import file_manager as fm
 import text_processor as tp
 
+# Images prepared concurrently (hashing, decoding, downscaling, caching). The engine
+# itself runs one image at a time: the RapidOCR wrappers keep per-call state on the
+# instance, and each inference already spreads across every core via the runtime's own pool.
+MAX_OCR_WORKERS = 8
+
+# Files hashed concurrently ahead of OCR (disk-bound; hashlib releases the GIL)
+MAX_HASH_WORKERS = 4
+
+# OCR text of previously scanned images, one JSON file per content hash.
+# Capped at config.OCR_CACHE_MAX_ENTRIES; the Settings page can clear it.
+OCR_CACHE_DIR = fm.get_application_path() / ".argus_ocr_cache"
+
+# GPU provider flag (e.g. "cuda") of each engine built by create_engine; absent means CPU
+_ENGINE_DEVICES = weakref.WeakKeyDictionary()
+
+@functools.lru_cache(maxsize=None)
+def _package_version(package: str) -> str:
+    """Cached: the installed package cannot change within a process."""
+    try:
+        from importlib.metadata import version
+        return version(package)
+    except Exception:
+        return "unknown"
+
+def _ocr_cache_tag(engine: "RapidOCR") -> str:
+    """
+    Identifies what produced cached text (OCR backend, its version, device + preprocessing);
+    entries under another tag are ignored.
+    """
+    package = type(engine).__module__.split('.')[0]
+    device = _ENGINE_DEVICES.get(engine, "cpu")
+    return f"{package}-{_package_version(package)}-{device}:{config.OCR_MAX_SIDE}:L"
+
 # ==========================================
 # ANALYSIS LOGIC
 # ==========================================
 
-def analyze_image(engine: RapidOCR, img_path: Path) -> Optional[Dict[str, Any]]:
+def _safe_digest(img_path: Path) -> Optional[str]:
+    """Content hash of an image, or None if it cannot be read."""
+    try:
+        return fm.file_digest(img_path)
+    except OSError:
+        return None
+
+def _ocr_cache_path(digest: Optional[str]) -> Optional[Path]:
+    """Returns the cache entry for an image's digest, or None if caching is disabled/unavailable."""
+    if not config.ENABLE_OCR_CACHE or digest is None:
+        return None
+    return OCR_CACHE_DIR / f"{digest}.json"
+
+def _ocr_cache_get(cache_path: Optional[Path], tag: str) -> Optional[Dict[str, Any]]:
+    """Returns the cached entry ({ocr, text, sig, type, sku, desc}) written under tag, or None on a miss."""
+    if cache_path is None:
+        return None
+    try:
+        entry = json.loads(cache_path.read_bytes())
+        if entry.get('ocr') != tag or not isinstance(entry.get('text'), str):
+            return None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+    # Hits count as recent use, so pruning removes the least recently used entries
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+    return entry
+
+def _ocr_cache_put(cache_path: Optional[Path], entry: Dict[str, Any]) -> None:
+    if cache_path is None:
+        return
+    try:
+        fm.ensure_directory(cache_path.parent)
+        cache_path.write_text(json.dumps(entry), encoding='utf-8')
+    except OSError as e:
+        print(f"⚠️ Failed to write OCR cache: {e}")
+
+def prune_ocr_cache(max_entries: int) -> None:
+    """Deletes the least recently used cache entries (oldest mtime) beyond max_entries."""
+    try:
+        with os.scandir(OCR_CACHE_DIR) as it:
+            entries = [(entry.stat().st_mtime, entry.path) for entry in it if entry.name.endswith('.json')]
+    except OSError:
+        return
+
+    entries.sort()
+    for _, path in entries[:max(0, len(entries) - max_entries)]:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+def clear_ocr_cache() -> None:
+    """Deletes every cached OCR result; the next run re-scans all images."""
+    fm.clean_directory(OCR_CACHE_DIR)
+
+def _load_for_ocr(img_path: Path) -> Any:
+    """
+    Decodes an image as grayscale, upright, and no larger than config.OCR_MAX_SIDE.
+    COA text stays legible at this size, while detection cost scales with pixel count.
+    
+    Returns:
+        np.ndarray, or the path string if Pillow cannot decode the file (RapidOCR loads it itself).
+    """
+    max_side = config.OCR_MAX_SIDE
+
+    try:
+        with Image.open(img_path) as img:
+            w, h = img.size
+            scale = max_side / max(w, h)
+            if scale < 1:
+                # JPEGs can decode straight to a 1/2, 1/4 or 1/8 scale (still >= the target)
+                img.draft("L", (math.ceil(w * scale), math.ceil(h * scale)))
+            img = ImageOps.exif_transpose(img).convert("L")
+    except Exception:
+        return str(img_path)
+
+    # Small images are passed through untouched
+    w, h = img.size
+    scale = max_side / max(w, h)
+    if scale < 1:
+        img = img.resize((max(1, int(w * scale)), max(1, int(h * scale))), Image.LANCZOS)
+
+    return np.asarray(img)
+
+def analyze_image(engine: "RapidOCR", img_path: Path,
+                  digest: Optional[str] = None,
+                  engine_lock: Optional[threading.Lock] = None) -> Optional[Dict[str, Any]]:
     """
     Performs OCR on a single image and extracts metadata immediately.
+    Results are cached under the image's content digest. The classification is
+    reused only while both config.DETECTION_SIGNATURE and tp.EXTRACTION_VERSION
+    match; otherwise the cached text is re-classified with the current settings and rules.
+    Pass engine_lock when the engine is shared between threads; inference is not thread-safe.
     """
     try:
-        result, _ = engine(str(img_path))
-        full_text = ""
-        if result:
-            full_text = "\n".join([line[1] for line in result if float(line[2]) > 0.6])
+        cache_path = _ocr_cache_path(digest)
+        tag = _ocr_cache_tag(engine)
+        entry = _ocr_cache_get(cache_path, tag)
+        signature = f"{config.DETECTION_SIGNATURE}/{tp.EXTRACTION_VERSION}"
+
+        if entry is not None and entry.get('sig') == signature:
+            return {
+                'path': img_path,
+                'text': entry['text'],
+                'type': entry.get('type', 'PROP'),
+                'sku': entry.get('sku'),
+                'desc': entry.get('desc')
+            }
+
+        if entry is not None:
+            full_text = entry['text']
+        else:
+            image = _load_for_ocr(img_path)
+            if engine_lock is None:
+                result, _ = engine(image)
+            else:
+                with engine_lock:
+                    result, _ = engine(image)
+            # Some RapidOCR releases report scores as strings, hence float()
+            full_text = "\n".join(line[1] for line in (result or ()) if float(line[2]) > 0.6)
         
         is_cert = tp.is_coa(full_text)
         
@@ -39,10 +198,16 @@ def analyze_image(engine: RapidOCR, img_path: Path) -> Optional[Dict[str, Any]]:
         if is_cert:
             item_code, item_desc = tp.extract_details(full_text)
 
+        item_type = 'COA' if is_cert else 'PROP'
+        _ocr_cache_put(cache_path, {
+            'ocr': tag, 'text': full_text, 'sig': signature,
+            'type': item_type, 'sku': item_code, 'desc': item_desc
+        })
+
         return {
             'path': img_path,
             'text': full_text,
-            'type': 'COA' if is_cert else 'PROP',
+            'type': item_type,
             'sku': item_code,
             'desc': item_desc
         }
@@ -53,6 +218,26 @@ def analyze_image(engine: RapidOCR, img_path: Path) -> Optional[Dict[str, Any]]:
 # CONSENSUS LOGIC
 # ==========================================
 
+def _find_corrections(sorted_descs: List[str]) -> Dict[str, str]:
+    """
+    Maps each description to the first more popular one that is over 80% similar.
+    Similarity is rapidfuzz's fuzz.ratio (normalized Indel distance, 0-100).
+    
+    Returns:
+        Dict[str, str]: {candidate: popular} for every description to be replaced.
+    """
+    corrections = {}
+
+    # All pairwise scores in one C call; pairs below the cutoff score 0
+    scores = process.cdist(sorted_descs, sorted_descs, scorer=fuzz.ratio,
+                           score_cutoff=80, workers=-1)
+    for i, candidate in enumerate(sorted_descs):
+        matches = np.flatnonzero(scores[i, :i] > 80)
+        if matches.size:
+            corrections[candidate] = sorted_descs[matches[0]]
+
+    return corrections
+
 def normalize_descriptions(groups: List[List[Dict]], log_func: Callable[[str], None]) -> None:
     """
     Applies consensus logic to fix typos in descriptions based on group majority.
@@ -71,17 +256,10 @@ def normalize_descriptions(groups: List[List[Dict]], log_func: Callable[[str], N
 
     counts = Counter(descriptions)
     sorted_descs = sorted(counts.keys(), key=lambda x: counts[x], reverse=True)
-    corrections = {}
+    corrections = _find_corrections(sorted_descs)
 
-    for i, candidate in enumerate(sorted_descs):
-        for j in range(i):
-            popular = sorted_descs[j]
-            ratio = difflib.SequenceMatcher(None, candidate, popular).ratio()
-            
-            if ratio > 0.80:
-                corrections[candidate] = popular
-                log_func(f"   ✨ Auto-Correcting: '{candidate}' → '{popular}'")
-                break
+    for candidate, popular in corrections.items():
+        log_func(f"   ✨ Auto-Correcting: '{candidate}' → '{popular}'")
     
     for group in groups:
         if not group: continue
@@ -93,6 +271,18 @@ def normalize_descriptions(groups: List[List[Dict]], log_func: Callable[[str], N
 # FILE OPERATIONS
 # ==========================================
 
+def _sku_prefix(sku: str) -> Optional[str]:
+    """
+    Returns everything before the SKU's trailing block of 4+ digits (the show prefix),
+    or None if it doesn't end in one. A plain backwards scan; no regex needed.
+    """
+    i = len(sku)
+    while i and sku[i - 1].isdecimal():
+        i -= 1
+
+    return sku[:i] if len(sku) - i >= 4 else None
+
+@functools.lru_cache(maxsize=512)
 def _get_group_key(sku: str) -> str:
     """
     Determines the grouping key by stripping the final numeric ID.
@@ -101,26 +291,40 @@ def _get_group_key(sku: str) -> str:
     """
     if not sku: return "UNKNOWN"
     
-    match = re.match(r"^(.*?)(?=\d{4,}$)", sku)
-    if match and match.group(1):
-        return match.group(1).upper()
+    prefix = _sku_prefix(sku)
+    if prefix:
+        return prefix.upper()
         
     return sku[:4].upper()
 
-def _get_unique_path(base_path: Path) -> Path:
-    """Generates a unique filename if the target already exists."""
-    if not base_path.exists():
-        return base_path
+def _scan_taken_names(target_dir: Path) -> Set[str]:
+    """Lists the names already present in a folder (normalized for case-insensitive filesystems)."""
+    try:
+        with os.scandir(target_dir) as entries:
+            return {os.path.normcase(entry.name) for entry in entries}
+    except OSError:
+        return set()
+
+def _get_unique_name(filename: str, taken: Set[str]) -> str:
+    """
+    Generates a unique filename if the target already exists.
+    'taken' holds the names already in (or assigned to) the folder and is updated in place,
+    so no filesystem check is needed per candidate.
+    """
+    key = os.path.normcase(filename)
+    if key not in taken:
+        taken.add(key)
+        return filename
 
     counter = 1
-    stem = base_path.stem
-    suffix = base_path.suffix
-    parent = base_path.parent
+    stem, suffix = os.path.splitext(filename)
 
     while True:
-        new_path = parent / f"{stem} ({counter}){suffix}"
-        if not new_path.exists():
-            return new_path
+        new_name = f"{stem} ({counter}){suffix}"
+        key = os.path.normcase(new_name)
+        if key not in taken:
+            taken.add(key)
+            return new_name
         counter += 1
 
 def _merge_skus(coas: List[Dict]) -> str:
@@ -134,8 +338,7 @@ def _merge_skus(coas: List[Dict]) -> str:
     if len(coas) == 1:
         return base_sku
 
-    match = re.match(r"^(.*?)(?=\d{4,}$)", base_sku)
-    prefix = match.group(1) if match else ""
+    prefix = _sku_prefix(base_sku) or ""
 
     merged = base_sku
     for coa in coas[1:]:
@@ -150,11 +353,16 @@ def _merge_skus(coas: List[Dict]) -> str:
             
     return merged
 
-def process_group(group: List[Dict], output_dir: Path, 
-                  folder_map: Dict[str, str], log_func: Callable[[str], None]) -> List[Path]:
+def plan_group(group: List[Dict], output_dir: Path, 
+               folder_map: Dict[str, str], log_func: Callable[[str], None],
+               taken_names: Optional[Dict[Path, Set[str]]] = None) -> Tuple[List[Path], List[Tuple[Path, Path]]]:
     """
-    Renames and moves a group.
+    Decides the target folder and final filename for every file in a group, without copying.
     Respects config.GROUP_FOLDERS setting.
+    'taken_names' caches each target folder's contents across groups of the same batch.
+    
+    Returns:
+        (Files already handled, i.e. discarded COAs; (source, destination) pairs to copy)
     """
     coas = [item for item in group if item['type'] == 'COA']
     
@@ -188,13 +396,21 @@ def process_group(group: List[Dict], output_dir: Path,
         log_message = f"📦 Group: {item_code_filename} -> (Root)"
 
     # 2. Create/Target Directory
-    target_dir.mkdir(parents=True, exist_ok=True)
+    fm.ensure_directory(target_dir)
+
+    if taken_names is None:
+        taken_names = {}
+    taken = taken_names.get(target_dir)
+    if taken is None:
+        taken = taken_names[target_dir] = _scan_taken_names(target_dir)
 
     base_name = f"{item_code_filename}-{item_desc}"
     log_func(log_message)
 
     successful_moves = []
+    copy_jobs = []
     
+    # Names are assigned serially (they depend on each other); only the copies run concurrently
     for i, item in enumerate(group):
         original_path = item['path']
         is_coa = (item['type'] == 'COA')
@@ -209,87 +425,217 @@ def process_group(group: List[Dict], output_dir: Path,
         if config.APPEND_ORIGINAL_NAME:
             new_filename = f"{base_name}-{suffix}_{original_path.stem}{original_path.suffix}"
 
-        final_path = _get_unique_path(target_dir / new_filename)
+        # Names are built as plain strings; one Path per file is made for the copy
+        final_path = target_dir / _get_unique_name(new_filename, taken)
+        copy_jobs.append((original_path, final_path))
 
-        if fm.copy_file(original_path, final_path):
-            successful_moves.append(original_path)
-
-    return successful_moves
+    return successful_moves, copy_jobs
 
 # ==========================================
 # MAIN ORCHESTRATOR
 # ==========================================
 
+# GPU execution providers in order of preference: (ORT provider, RapidOCR flag suffix, label)
+_GPU_PROVIDERS = (
+    ("CUDAExecutionProvider", "cuda", "CUDA"),
+    ("DmlExecutionProvider", "dml", "DirectML"),
+)
+
+@functools.lru_cache(maxsize=None)
+def _find_gpu_provider() -> Optional[Tuple[str, str]]:
+    """
+    Picks the best GPU execution provider ONNX Runtime can actually use.
+    Cached: the installed providers cannot change within a process, and enumerating
+    them loads provider libraries (slow on Windows) each time the engine is rebuilt.
+    
+    Returns:
+        (RapidOCR flag suffix, display label), or None if only the CPU is available.
+    """
+    try:
+        import onnxruntime as ort
+    except ImportError:
+        return None
+
+    available = ort.get_available_providers()
+    for provider, flag, label in _GPU_PROVIDERS:
+        if provider in available:
+            return flag, label
+    return None
+
+def _warm_up(engine: "RapidOCR") -> None:
+    """
+    Runs one small synthetic image through the engine, so session initialization
+    (and GPU kernel selection) happens here instead of on the first real photo.
+    """
+    img = Image.new("L", (320, 96), 255)
+    ImageDraw.Draw(img).text((16, 40), "ARGUS 0000", fill=0)
+
+    try:
+        engine(np.asarray(img))
+    except Exception:
+        pass
+
+def _create_cpu_engine(RapidOCR: type) -> Tuple["RapidOCR", str]:
+    """
+    Builds a CPU engine, preferring the OpenVINO backend when it is installed
+    (its CPU kernels run the detection model faster than ONNX Runtime's).
+    
+    Returns:
+        (engine, backend label for the log).
+    """
+    try:
+        from rapidocr_openvino import RapidOCR as RapidOCROpenVINO
+        return RapidOCROpenVINO(), "OpenVINO"
+    except Exception:
+        return RapidOCR(det_use_cuda=False, cls_use_cuda=False, rec_use_cuda=False), "ONNX Runtime"
+
+def create_engine(log_func: Callable[[str], None]) -> "RapidOCR":
+    """
+    Builds the OCR engine according to config.USE_GPU.
+    Construction loads the ONNX models, so callers should reuse the result across runs.
+    """
+    log_func("Initializing AI Engine...")
+    from rapidocr_onnxruntime import RapidOCR
+
+    engine = None
+    if config.USE_GPU:
+        # User wants GPU -> Use the best available provider, fallback if there is none
+        gpu = _find_gpu_provider()
+        if gpu is None:
+            log_func("⚠️ No GPU provider available. Falling back to CPU.")
+        else:
+            flag, label = gpu
+            try:
+                engine = RapidOCR(**{f"{model}_use_{flag}": True for model in ("det", "cls", "rec")})
+                _ENGINE_DEVICES[engine] = flag
+                log_func(f"🚀 GPU Acceleration Enabled ({label})")
+            except Exception:
+                log_func("⚠️ GPU request failed. Falling back to CPU.")
+
+    if engine is None:
+        engine, backend = _create_cpu_engine(RapidOCR)
+        mode = "User Setting" if not config.USE_GPU else "Fallback"
+        log_func(f"💻 CPU Mode Active ({mode}, {backend})")
+
+    _warm_up(engine)
+    return engine
+
+def _write_debug_log(cleaner: threading.Thread, path: Path, entries: List[Tuple[str, str]]) -> None:
+    """Writes the batch text log once the old logs have been cleared (background thread)."""
+    cleaner.join()
+    fm.save_batch_log(path, entries)
+
 def run_sorter(file_list: List[str], output_path: Path, 
                log_func: Callable[[str], None], 
                progress_func: Callable[[float], None], 
-               stop_event: Any) -> None:
-    
+               stop_event: Any,
+               engine: Optional["RapidOCR"] = None) -> None:
+    """
+    Runs the full scan -> group -> normalize -> copy pipeline.
+    Pass a previously created engine to skip model loading.
+    """
     log_func("--- Starting Argus ---")
     log_func(f"Selected {len(file_list)} images.")
     
+    # Folders may have been moved or deleted since the previous batch
+    fm.forget_directories()
+
+    # Debug-log disk work (clearing old logs, writing the new one) runs on a
+    # background thread so it never delays scanning or sorting
     logs_dir = fm.get_application_path() / "extracted_text"
+    log_writer = None
     if config.SAVE_DEBUG_LOGS:
         logs_dir.mkdir(exist_ok=True)
-        fm.clean_directory(logs_dir)
+        log_writer = threading.Thread(target=fm.clean_directory, args=(logs_dir,), name="argus-log")
+        log_writer.start()
     
     if stop_event.is_set(): return
-    log_func("Initializing AI Engine...")
+    if engine is None:
+        engine = create_engine(log_func)
     
-    # --- UPDATED GPU LOGIC ---
-    if config.USE_GPU:
-        # User wants GPU -> Try CUDA, fallback if it fails
-        try:
-            engine = RapidOCR(det_use_cuda=True, cls_use_cuda=True, rec_use_cuda=True)
-            log_func("🚀 GPU Acceleration Enabled (CUDA)")
-        except Exception:
-            log_func("⚠️ GPU request failed. Falling back to CPU.")
-            engine = RapidOCR()
-    else:
-        # User disabled GPU -> Force CPU
-        engine = RapidOCR(det_use_cuda=False, cls_use_cuda=False, rec_use_cuda=False)
-        log_func("💻 CPU Mode Active (User Setting)")
-    # -------------------------
+    # Image loading and caching run in parallel, but only one inference at a time
+    # (the engine is not thread-safe on any backend; see MAX_OCR_WORKERS)
+    engine_lock = threading.Lock()
     
     # --- SCANNING PHASE ---
-    analyzed_results = []
     total = len(file_list)
     sorted_files = sorted([Path(f) for f in file_list], key=lambda p: p.name.lower())
-
-    for idx, img_path in enumerate(sorted_files):
-        if stop_event.is_set():
-            log_func("\n🛑 OPERATION CANCELLED.")
-            return
-
-        progress = (idx / total) * 0.8
-        progress_func(progress)
-        
-        log_func(f"Reading: {img_path.name}")
-        res = analyze_image(engine, img_path)
-        
-        if res:
-            if config.SAVE_DEBUG_LOGS:
-                fm.save_text_log(logs_dir / f"{img_path.stem}.md", res['text'])
-            analyzed_results.append(res)
+    
+    # Results are stored by index so grouping still sees the sorted file order
+    scan_results: List[Optional[Dict[str, Any]]] = [None] * total
+    workers = max(1, min(MAX_OCR_WORKERS, os.cpu_count() or 1, total))
+    log_func(f"⚡ OCR workers: {workers} (inference runs one image at a time)")
+
+    # Two-stage pipeline: files are hashed on a small I/O pool and each new image is
+    # handed to the OCR pool as soon as its hash is known, so inference starts while
+    # the rest of the batch is still being read.
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argus-ocr") as pool, \
+         ThreadPoolExecutor(max_workers=min(MAX_HASH_WORKERS, total) or 1, thread_name_prefix="argus-hash") as hasher:
+        hash_futures = {hasher.submit(_safe_digest, path): idx for idx, path in enumerate(sorted_files)}
+
+        # Identical files (e.g. originals + backups) are OCR'd once; the rest reuse the result.
+        # Unreadable files (no digest) are never merged.
+        copies: Dict[Any, List[int]] = {}
+        futures = {}
+        for hash_future in as_completed(hash_futures):
+            if stop_event.is_set():
+                hasher.shutdown(wait=False, cancel_futures=True)
+                pool.shutdown(wait=False, cancel_futures=True)
+                log_func("\n🛑 OPERATION CANCELLED.")
+                return
+
+            idx = hash_futures[hash_future]
+            digest = hash_future.result()
+            key = digest if digest is not None else ('unread', idx)
+
+            if key in copies:
+                copies[key].append(idx)
+            else:
+                copies[key] = [idx]
+                futures[pool.submit(analyze_image, engine, sorted_files[idx], digest, engine_lock)] = copies[key]
+
+        done = 0
+        for future in as_completed(futures):
+            if stop_event.is_set():
+                pool.shutdown(wait=False, cancel_futures=True)
+                log_func("\n🛑 OPERATION CANCELLED.")
+                return
+
+            res = future.result()
+
+            for idx in futures[future]:
+                img_path = sorted_files[idx]
+                done += 1
+
+                log_func(f"Read: {img_path.name}")
+                progress_func((done / total) * 0.8)
+                
+                if res:
+                    scan_results[idx] = res if res['path'] == img_path else {**res, 'path': img_path}
+
+    analyzed_results = [res for res in scan_results if res]
+
+    # Every entry this batch used or wrote is now the most recent, so it survives
+    if config.ENABLE_OCR_CACHE:
+        prune_ocr_cache(config.OCR_CACHE_MAX_ENTRIES)
+
+    if log_writer is not None:
+        entries = [(res['path'].stem, res['text']) for res in analyzed_results]
+        log_writer = threading.Thread(target=_write_debug_log, name="argus-log",
+                                      args=(log_writer, logs_dir / "_batch.md", entries))
+        log_writer.start()
 
     # --- GROUPING PHASE ---
-    groups = []
-    current_group = []
-    
-    for i, item in enumerate(analyzed_results):
-        current_group.append(item)
-        if item['type'] == 'COA':
-            next_is_coa = False
-            if i + 1 < len(analyzed_results):
-                if analyzed_results[i+1]['type'] == 'COA':
-                    next_is_coa = True
-            
-            if not next_is_coa:
-                groups.append(current_group)
-                current_group = []
-    
-    if current_group:
-        groups.append(current_group)
+    # A group closes after the last COA of each run of consecutive COAs; groups are
+    # then taken as list slices between those boundaries (trailing props form the last one)
+    count = len(analyzed_results)
+    is_coa = [item['type'] == 'COA' for item in analyzed_results]
+    # Each flag is paired with its successor's (False past the end), avoiding index lookups
+    ends = [i for i, (cur, nxt) in enumerate(zip(is_coa, is_coa[1:] + [False]), 1) if cur and not nxt]
+    if not ends or ends[-1] != count:
+        ends.append(count)
+
+    groups = [analyzed_results[start:end] for start, end in zip([0] + ends, ends) if start < end]
 
     # --- CONSENSUS PHASE ---
     if stop_event.is_set(): return
@@ -300,8 +646,12 @@ def run_sorter(file_list: List[str], output_path: Path,
     progress_func(0.9)
     
     folder_map = {}
+    taken_names = {}
     files_processed_count = 0
+    copy_jobs = []
     
+    # Every group is planned first, then all copies run as one batch on the I/O pool,
+    # so small groups don't each wait for their own handful of copies to drain
     for group in groups:
         if stop_event.is_set():
             log_func("\n🛑 CANCELLED.")
@@ -314,8 +664,23 @@ def run_sorter(file_list: List[str], output_path: Path,
             log_func("⚠️ Skipping orphan group (No COA found)")
             continue
         
-        processed = process_group(group, output_path, folder_map, log_func)
-        files_processed_count += len(processed)
+        handled, group_jobs = plan_group(group, output_path, folder_map, log_func, taken_names)
+        files_processed_count += len(handled)
+        copy_jobs.extend(group_jobs)
+
+    if stop_event.is_set():
+        log_func("\n🛑 CANCELLED.")
+        return
+
+    # Stop skips every copy that has not started yet
+    files_processed_count += sum(fm.copy_files(copy_jobs, config.COPY_MODE, stop_event))
+
+    if stop_event.is_set():
+        log_func("\n🛑 CANCELLED.")
+        return
+
+    if log_writer is not None:
+        log_writer.join()
 
     progress_func(1.0)
     log_func("================================")
@@ -7,19 +7,79 @@ Description: The logic engine for text analysis. Implements multiple extraction
 """
 
 import re
+import functools
+import itertools
 from typing import Optional, Tuple, Set
 import config
 
+# Optional: Google RE2, a linear-time regex engine (falls back to re)
+try:
+    import re2
+except ImportError:
+    re2 = None
+
 # ==========================================
 # CONSTANTS & PATTERNS
 # ==========================================
 
+# Version of the classification/extraction rules below. Bump it whenever is_coa,
+# extract_details or their helpers change their output, so cached results are re-derived.
+EXTRACTION_VERSION = 1
+
 # Words that should generally remain lowercase in titles (unless at the start)
 LOWERCASE_WORDS: Set[str] = {
     'A', 'An', 'The', 'And', 'But', 'Or', 'Nor', 'For', 'Yet', 'So', 
     'At', 'By', 'In', 'Of', 'On', 'To', 'Up', 'With', 'From'
 }
 
+# Precompiled once at import; these run for every COA processed
+# Characters allowed in a SKU's numeric tail ('O' being a misread '0')
+_SKU_TAIL_CHARS = '0123456789O'
+
+# Digit context fixes in one pass: 2O24 -> 2024 (sandwich) and 2.O -> 2.0 (dot separator)
+_DIGIT_CONTEXT_O_RE = re.compile(r'(?<=\d)O(?=\d)|(?<=\d)\.O', re.IGNORECASE)
+# Zero-side fixes in one pass: A.0 -> A.O (group 1 is the rest of the word the new
+# 'O' starts) and zeros inside words that are not numbers (B0B -> BOB)
+_ZERO_TO_LETTER_RE = re.compile(r'(?<=[a-zA-Z])\.0(\w*)|\b\w*0\w*\b')
+
+_SEASON_CODE_RE = re.compile(r'\(?\bS\d{1,2}E\d{1,2}\b\)?', re.IGNORECASE)
+
+# Missing-space fixes in one pass: every alternative is zero-width, so a plain space
+# is inserted at each spot (no group expansion). Covers squished apostrophes
+# (Clarke'sbackpack), CamelCase (RussellLightbourne) and glued parentheses (Jacket(Black)).
+_MISSING_SPACE_RE = re.compile(r"(?i:(?<='s)(?=[a-zA-Z]))|(?<=[a-z])(?=[A-Z])|(?<=[a-zA-Z0-9])(?=\()")
+# Title-case word fixes: each word is looked up once. Roman numerals (as title() leaves
+# them) are uppercased; LOWERCASE_WORDS in any case are lowercased unless a dot follows.
+_WORD_RE = re.compile(r'\w+')
+_ROMAN_NUMERALS = frozenset({'Ii', 'Iii', 'Iv', 'Vi', 'Vii', 'Viii', 'Ix', 'Xi', 'Xii', 'Xiii'})
+_LOWERCASE_KEYS = frozenset(word.lower() for word in LOWERCASE_WORDS)
+_ACRONYM_RE = re.compile(r'\b([a-zA-Z]\.)+[a-zA-Z0-9]?\b')
+# Runs of whitespace and invalid characters; the words between them are joined with hyphens
+_DESC_SEPARATOR_RE = re.compile(r'[^\w\'\-\.]+')
+# ASCII fast path for the same rule: every separator becomes a space, then str.split()
+_ASCII_DESC_KEEP = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_'-.")
+_ASCII_DESC_SEPARATORS = str.maketrans({chr(i): ' ' for i in range(128) if chr(i) not in _ASCII_DESC_KEEP})
+
+# Translation table deleting the characters Windows forbids in filenames
+_ILLEGAL_FILENAME_CHARS = str.maketrans('', '', '<>:"/\\|?*')
+
+_STANDARD_PATTERN_RE = re.compile(r'([A-Za-z&]+\d{4,7})\s*(.+?)\s+was used in', re.IGNORECASE | re.DOTALL)
+# The same pattern for RE2, used on ASCII text: RE2 has no backtracking blowup on long
+# OCR blobs. Its \d and \s are narrower than Python's, so the ASCII classes are spelled out.
+_STANDARD_PATTERN_RE2 = re2.compile(
+    r'(?is)([A-Za-z&]+[0-9]{4,7})[\t\n\v\f\r\x1c-\x1f ]*(.+?)[\t\n\v\f\r\x1c-\x1f ]+was used in'
+) if re2 else None
+# The phrase every standard match must end with (same flags, so it finds exactly the same spots)
+_USED_IN_RE = re.compile(r'was used in', re.IGNORECASE)
+# Introductory phrases preceding the "CODE Description" line in some layouts (lowercase).
+# After "production of the above", the description may continue on a "Daily Log" line.
+_PRODUCTION_ANCHOR = "production of the above"
+_INTRO_ANCHORS = (_PRODUCTION_ANCHOR, "certifies that the following item")
+# Searched in the lowercased text, so one scan finds every anchor
+_INTRO_ANCHOR_RE = re.compile('|'.join(map(re.escape, _INTRO_ANCHORS)))
+_ANCHOR_LINE_RE = re.compile(r"^([A-Z0-9-]{3,})\s+(.*)$")
+_MERGED_WORD_RE = re.compile(r'(\d+)([A-Za-z]{3,})$')
+
 # ==========================================
 # DETECTION LOGIC
 # ==========================================
@@ -32,6 +92,7 @@ def is_coa(text: str) -> bool:
         Uses a weighted keyword system defined in config.py.
         - Requires at least 1 STRONG indicator (e.g., "Certificate of Authenticity").
         - OR requires at least 3 WEAK indicators (e.g., "Propabilia", "Movie & TV").
+        Matching uses the precompiled lookups behind config.has_indicators().
     
     Args:
         text (str): The full OCR text of the document.
@@ -41,13 +102,17 @@ def is_coa(text: str) -> bool:
     """
     if not text:
         return False
-        
-    text_upper = text.upper()
-    
-    strong_hits = sum(1 for kw in config.STRONG_INDICATORS if kw in text_upper)
-    weak_hits = sum(1 for kw in config.WEAK_INDICATORS if kw in text_upper)
-    
-    return strong_hits >= 1 or weak_hits >= 3
+
+    return _is_coa_cached(text, config.DETECTION_SIGNATURE)
+
+@functools.lru_cache(maxsize=2048)
+def _is_coa_cached(text: str, signature: str) -> bool:
+    """
+    Memoized body of is_coa(). The detection signature is part of the key,
+    so results computed under older indicator lists are never reused.
+    """
+    # Strong and Weak indicators are matched together; a Strong hit decides immediately
+    return config.has_indicators(text, 3)
 
 # ==========================================
 # CLEANING & FORMATTING HELPERS
@@ -67,19 +132,57 @@ def _fix_sku_tail(sku: str) -> str:
     # --- CRASH FIX: Handle None ---
     if not sku: return ""
 
-    # Regex: Match suffix of 4+ characters containing only Digits or 'O'
-    match = re.search(r'([0-9O]{4,})$', sku)
+    # Suffix of 4+ characters containing only Digits or 'O' (rstrip finds it in C)
+    head = sku.rstrip(_SKU_TAIL_CHARS)
+    suffix = sku[len(head):]
     
-    if match:
-        suffix = match.group(1)
-        # Only apply fix if an 'O' is actually present
-        if 'O' in suffix:
-            fixed_suffix = suffix.replace('O', '0')
-            # Splice fixed suffix back onto the original string
-            return sku[:-len(suffix)] + fixed_suffix
+    # Only apply fix if an 'O' is actually present
+    if len(suffix) >= 4 and 'O' in suffix:
+        # Splice fixed suffix back onto the original string
+        return head + suffix.replace('O', '0')
             
     return sku
 
+def _upper_match(m: re.Match) -> str:
+    """Substitution callback: uppercases the whole match."""
+    return m.group(0).upper()
+
+def _title_word_repl(m: re.Match) -> str:
+    """Substitution callback: uppercases Roman numerals, replaces linking words with their lowercase form."""
+    word = m.group(0)
+    if word in _ROMAN_NUMERALS:
+        return word.upper()
+
+    # A following dot marks an initial or abbreviation (e.g. "A.")
+    end = m.end()
+    if m.string[end:end + 1] == '.':
+        return word
+
+    if word.isascii():
+        lower = word.lower()
+        return lower if lower in _LOWERCASE_KEYS else word
+
+    # Case-insensitive matching also accepts look-alikes such as 'ſ' for 's'
+    return next((w.lower() for w in LOWERCASE_WORDS if re.fullmatch(w, word, re.IGNORECASE)), word)
+
+def _fix_zero_word(word: str) -> str:
+    """Turns '0' into 'O' inside a word that is not a number."""
+    if word.isdigit(): return word
+    if any(c.isdigit() and c != '0' for c in word): return word
+    return word.replace('0', 'O')
+
+def _zero_to_letter_repl(m: re.Match) -> str:
+    """Substitution callback for _ZERO_TO_LETTER_RE."""
+    rest = m.group(1)
+    if rest is None:
+        return _fix_zero_word(m.group(0))
+    # The word now starting with 'O' still gets the word-based fix
+    return '.' + _fix_zero_word('O' + rest)
+
+def _digit_context_repl(m: re.Match) -> str:
+    """Substitution callback: the trailing 'O' of the match becomes '0'."""
+    return m.group(0)[:-1] + '0'
+
 def _fix_typo_zeros(text: str) -> str:
     """
     Corrects common OCR confusions between '0' (zero) and 'O' (letter) in descriptions.
@@ -88,20 +191,18 @@ def _fix_typo_zeros(text: str) -> str:
     if not text: return ""
 
     # 1. Sandwich Fix: Digit + O + Digit -> 0 (e.g., 2O24 -> 2024)
-    text = re.sub(r'(?<=\d)O(?=\d)', '0', text, flags=re.IGNORECASE)
-
     # 2. Contextual Fixes: Dot separators (e.g., 2.O -> 2.0, A.0 -> A.O)
-    text = re.sub(r'(?<=\d)\.O', '.0', text, flags=re.IGNORECASE)
-    text = re.sub(r'(?<=[a-zA-Z])\.0', '.O', text)
-
-    # 3. Word-based Logic
-    def repl(m):
-        word = m.group(0)
-        if word.isdigit(): return word
-        if any(c.isdigit() and c != '0' for c in word): return word
-        return word.replace('0', 'O')
-    
-    return re.sub(r'\b\w*0\w*\b', repl, text)
+    # The digit-side fixes never overlap, so they share a single scan. They create
+    # zeros that the later fixes must see, so they cannot join that scan.
+    text = _DIGIT_CONTEXT_O_RE.sub(_digit_context_repl, text)
+
+    # The remaining fixes only touch zeros; most descriptions have none
+    if '0' not in text:
+        return text
+
+    # 3. Word-based Logic, in the same scan as the letter-side dot fix (A.0 -> A.O);
+    # the word following such a dot is fixed by the same callback
+    return _ZERO_TO_LETTER_RE.sub(_zero_to_letter_repl, text)
 
 def _move_season_code(text: str) -> Tuple[str, str]:
     """
@@ -113,8 +214,7 @@ def _move_season_code(text: str) -> Tuple[str, str]:
     # --- CRASH FIX: Handle None ---
     if not text: return "", ""
 
-    pattern = r'\(?\bS\d{1,2}E\d{1,2}\b\)?'
-    match = re.search(pattern, text, re.IGNORECASE)
+    match = _SEASON_CODE_RE.search(text)
     
     if not match:
         return text, ""
@@ -134,57 +234,56 @@ def _clean_description(raw_desc: str) -> str:
     # --- CRASH FIX: Handle None ---
     if not raw_desc: return "Unknown Item"
 
+    return _clean_description_cached(raw_desc, config.FORCE_UPPERCASE_RE)
+
+@functools.lru_cache(maxsize=1024)
+def _clean_description_cached(raw_desc: str, force_uppercase_re: Optional[re.Pattern]) -> str:
+    """
+    Memoized body of _clean_description(). The Force Uppercase pattern is part of
+    the key, so editing that list never returns a stale result.
+    """
     # 1. Zero/O Typo Fixes
     desc = _fix_typo_zeros(raw_desc)
     
     # 2. Fix Squished Apostrophes (Clarke'sbackpack -> Clarke's backpack)
-    desc = re.sub(r"('s)(?=[a-zA-Z])", r"\1 ", desc, flags=re.IGNORECASE)
-
     # 3. CamelCase Splitter (RussellLightbourne -> Russell Lightbourne)
-    desc = re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', desc)
-
     # 4. Unglue Parentheses
-    desc = re.sub(r'(?<=[a-zA-Z0-9])\(', ' (', desc)
+    desc = _MISSING_SPACE_RE.sub(' ', desc)
     
     # 5. Apply Title Case
     desc = desc.title()
     desc = desc.replace("'S", "'s")  # Fix possessive case ('S -> 's)
 
     # 6. Restore Roman Numerals (e.g., Iii -> III)
-    roman_pattern = r'\b(Ii|Iii|Iv|Vi|Vii|Viii|Ix|Xii?i?)\b'
-    desc = re.sub(roman_pattern, lambda m: m.group(0).upper(), desc)
-
     # 7. Apply Lowercase Rules (Conjunctions, Prepositions)
-    for word in LOWERCASE_WORDS:
-        pattern = r'\b' + word + r'\b(?!\.)'
-        desc = re.sub(pattern, word.lower(), desc, flags=re.IGNORECASE)
+    desc = _WORD_RE.sub(_title_word_repl, desc)
 
     # 8. Force Uppercase for Specific Acronyms (Configurable)
-    for word in config.FORCE_UPPERCASE:
-        pattern = r'\b' + word + r'\b'
-        desc = re.sub(pattern, word.upper(), desc, flags=re.IGNORECASE)
+    if force_uppercase_re:
+        desc = force_uppercase_re.sub(_upper_match, desc)
 
     # 9. Restore Acronym Formatting (A.L.I.E.)
-    def upper_acronym(m):
-        return m.group(0).upper()
-    desc = re.sub(r'\b([a-zA-Z]\.)+[a-zA-Z0-9]?\b', upper_acronym, desc)
+    desc = _ACRONYM_RE.sub(_upper_match, desc)
 
     # 10. Final Character Cleanup
-    desc = re.sub(r'[^\w\s\'\-\.]', ' ', desc)
+    # Invalid characters count as whitespace; dropping empty pieces trims both ends,
+    # and joining with hyphens keeps filenames safe
+    if desc.isascii():
+        desc = '-'.join(desc.translate(_ASCII_DESC_SEPARATORS).split())
+    else:
+        desc = '-'.join([word for word in _DESC_SEPARATOR_RE.split(desc) if word])
 
-    desc = desc.strip()
     # Ensure the very first letter is always Uppercase
     if desc:
         desc = desc[0].upper() + desc[1:]
 
-    # Collapse multiple spaces into single hyphens for filename safety
-    return re.sub(r'\s+', '-', desc)
+    return desc
 
 def clean_filename(text: str) -> str:
     """Removes illegal characters for Windows filenames."""
     # --- CRASH FIX: Handle None ---
     if not text: return ""
-    return re.sub(r'[<>:"/\\|?*]', '', text).strip()
+    return text.translate(_ILLEGAL_FILENAME_CHARS).strip()
 
 # ==========================================
 # EXTRACTION LOGIC
@@ -204,33 +303,60 @@ def extract_details(text: str) -> Tuple[Optional[str], Optional[str]]:
     # --- CRASH FIX: The Main Fix ---
     if not text:
         return None, None
-        
-    lines = [line.strip() for line in text.split('\n') if line.strip()]
+
+    return _extract_details_cached(text, config.FORCE_UPPERCASE_RE)
+
+@functools.lru_cache(maxsize=1024)
+def _extract_details_cached(text: str, force_uppercase_re: Optional[re.Pattern]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Memoized body of extract_details(). Re-scanned images yield identical text;
+    the Force Uppercase pattern is part of the key, as descriptions depend on it.
+    """
     raw_code = None
     raw_desc = None
 
     # --- STRATEGY 1: Standard Regex (Primary) ---
-    pattern = r'([A-Za-z&]+\d{4,7})\s*(.+?)\s+was used in'
-    match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+    # A match can only end at a "was used in", so the lazy description scan is
+    # limited to the text before the last one (and skipped if there is none).
+    # DOTALL stays: OCR often wraps a description over several lines.
+    search_end = None
+    for used_in in _USED_IN_RE.finditer(text):
+        search_end = used_in.end()
+
+    standard_re = _STANDARD_PATTERN_RE
+    if _STANDARD_PATTERN_RE2 is not None and text.isascii():
+        standard_re = _STANDARD_PATTERN_RE2
+
+    match = standard_re.search(text, 0, search_end) if search_end else None
     if match:
         raw_code = match.group(1)
         raw_desc = match.group(2)
 
     # --- STRATEGY 2: Context Anchors (Fallback) ---
     if not raw_code:
-        intro_anchors = ["production of the above", "certifies that the following item"]
+        # Anchors are found in one scan of the lowercased text (same line breaks as the
+        # original); lines are only split once an anchor has been found
+        text_lower = text.lower()
+        raw_lines = None
+        line_no = 0
+        counted_to = 0
         
-        for i, line in enumerate(lines):
-            matched_anchor = next((a for a in intro_anchors if a in line.lower()), None)
+        for anchor in _INTRO_ANCHOR_RE.finditer(text_lower):
+            line_no += text_lower.count('\n', counted_to, anchor.start())
+            counted_to = anchor.start()
+
+            if raw_lines is None:
+                raw_lines = text.split('\n')
+
+            # The next two non-empty lines after the anchor's line
+            following = list(itertools.islice(
+                (stripped for line in raw_lines[line_no + 1:] if (stripped := line.strip())), 2
+            ))
             
-            if not matched_anchor:
-                continue
-                
-            if i + 1 >= len(lines):
+            if not following:
                 continue
 
-            target_line = lines[i+1]
-            match_ctx = re.match(r"^([A-Z0-9-]{3,})\s+(.*)$", target_line)
+            match_ctx = _ANCHOR_LINE_RE.match(following[0])
             
             if not match_ctx:
                 continue
@@ -239,8 +365,12 @@ def extract_details(text: str) -> Tuple[Optional[str], Optional[str]]:
             raw_desc = match_ctx.group(2)
 
             # Special Handling: Multi-line description check
-            if "production of the above" in matched_anchor and i + 2 < len(lines):
-                next_line = lines[i+2]
+            line_start = text_lower.rfind('\n', 0, anchor.start()) + 1
+            line_end = text_lower.find('\n', anchor.start())
+            anchor_line = text_lower[line_start:line_end] if line_end >= 0 else text_lower[line_start:]
+
+            if _PRODUCTION_ANCHOR in anchor_line and len(following) > 1:
+                next_line = following[1]
                 if "NOT VALID" not in next_line and "www" not in next_line and "Daily Log" in next_line:
                     raw_desc += f" {next_line}"
             
@@ -252,7 +382,7 @@ def extract_details(text: str) -> Tuple[Optional[str], Optional[str]]:
         # === NEW: De-Merge Logic (Harold Fix) ===
         # If OCR missed the space (e.g. GOOSEBUMPSO695HAROLD), separate them.
         # Look for: Digits followed immediately by 3+ letters at end of string.
-        merge_check = re.search(r'(\d+)([A-Za-z]{3,})$', raw_code)
+        merge_check = _MERGED_WORD_RE.search(raw_code)
         if merge_check:
             # Found a merge! (e.g. 695 + HAROLD)
             digits = merge_check.group(1)
@@ -10,14 +10,8 @@ import os
 import sys
 import logging
 from pathlib import Path
-from typing import List, Optional
+from typing import List
 
-# Configure professional logging instead of simple print statements
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    datefmt="%H:%M:%S"
-)
 logger = logging.getLogger(__name__)
 
 def inject_local_libraries(folder_name: str = "libraries") -> bool:
@@ -91,6 +85,14 @@ def validate_cuda_support(providers: List[str]) -> None:
 
 def main():
     """Main execution entry point."""
+    # Configure professional logging instead of simple print statements.
+    # Done here rather than at import, so importing this module has no side effects.
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        datefmt="%H:%M:%S"
+    )
+
     logger.info("Starting GPU Verification...")
     
     # 1. Inject DLLs